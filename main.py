@@ -2,17 +2,25 @@
 FABRIK Interactive Visualizer
 Main entry point for the application
 """
+import argparse
+
 from visualizer import FabrikVisualizer
 
 
 def main():
     """Launch the interactive FABRIK visualizer."""
+    parser = argparse.ArgumentParser(description="FABRIK Interactive Visualizer")
+    parser.add_argument("--reachability", action="store_true",
+                        help="shade the background with a batched reachability map")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("FABRIK Interactive Visualizer")
     print("=" * 60)
     print("\nStarting application...")
     print("\nInstructions:")
     print("  • Click anywhere in the window to set a target")
+    print("  • Drag with the left button held to follow the cursor")
     print("  • The robotic arm will move to reach that point")
     print("  • Green target = reachable")
     print("  • Red target = out of reach")
@@ -20,7 +28,7 @@ def main():
     print("\n" + "=" * 60 + "\n")
     
     # Create and run visualizer
-    app = FabrikVisualizer(width=1000, height=700)
+    app = FabrikVisualizer(width=1000, height=700, reachability=args.reachability)
     app.run()
 
 
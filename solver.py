@@ -5,38 +5,109 @@ Implementation of the FABRIK algorithm for 2D inverse kinematics.
 import numpy as np
 import math
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; without it the kernels below run as plain Python
+    njit = None
+
 
 def unitVector(vector):
-    """Returns the unit vector of a given input vector."""
-    return vector / np.linalg.norm(vector)
+    """Returns the unit vector of a given 2D input vector."""
+    return vector * (1.0 / math.hypot(vector[0], vector[1]))
 
 
-class Segment2D:
-    """Represents a single segment in the kinematic chain."""
+def _scaleRows(vectors, lengths, norms):
+    """Scale each row of an (M, 2) array in place to the given length.
     
-    def __init__(self, referenceX, referenceY, length, angle):
-        """
-        Initialize a segment.
-        
-        Args:
-            referenceX: X coordinate of the reference point
-            referenceY: Y coordinate of the reference point
-            length: Length of the segment
-            angle: Initial angle in degrees
-        """
-        self.angle = angle
-        self.length = length
-        
-        deltaX = math.cos(math.radians(angle)) * length
-        deltaY = math.sin(math.radians(angle)) * length
-        
-        self.point = np.array([referenceX + deltaX, referenceY + deltaY])
+    Zero rows map to +Y. norms is an (M,) scratch buffer.
+    """
+    np.hypot(vectors[:, 0], vectors[:, 1], out=norms)
+    zero = norms == 0.0
+    vectors[zero] = (0.0, 1.0)
+    norms[zero] = 1.0
+    np.divide(lengths, norms, out=norms)
+    vectors *= norms[:, np.newaxis]
+
+
+def _fabrik_pass(points, lengths, targetX, targetY, baseX, baseY):
+    """Run one backward and forward FABRIK sweep over points in place.
+    
+    points is indexed as points[i][0] so the same body runs compiled on an
+    (N+1, 2) array or as plain Python on nested lists.
+    """
+    n = len(lengths)
+    
+    # Backward reaching (from end effector to base)
+    points[n][0] = targetX
+    points[n][1] = targetY
+    for i in range(n, 1, -1):
+        dx = points[i-1][0] - points[i][0]
+        dy = points[i-1][1] - points[i][1]
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance == 0.0:
+            # Coincident joints: pick an arbitrary direction
+            dx, dy, distance = 0.0, 1.0, 1.0
+        scale = lengths[i-1] / distance
+        points[i-1][0] = points[i][0] + dx * scale
+        points[i-1][1] = points[i][1] + dy * scale
+    
+    # Forward reaching (from base to end effector)
+    points[0][0] = baseX
+    points[0][1] = baseY
+    for i in range(1, n + 1):
+        dx = points[i][0] - points[i-1][0]
+        dy = points[i][1] - points[i-1][1]
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance == 0.0:
+            # Coincident joints: pick an arbitrary direction
+            dx, dy, distance = 0.0, 1.0, 1.0
+        scale = lengths[i-1] / distance
+        points[i][0] = points[i-1][0] + dx * scale
+        points[i][1] = points[i-1][1] + dy * scale
+
+
+def _fabrik_solve(points, lengths, targetX, targetY, toleranceSq, baseX, baseY, maxIterations):
+    """Iterate FABRIK sweeps until the end effector is within tolerance.
+    
+    Returns the number of sweeps performed, at most maxIterations.
+    """
+    n = len(lengths)
+    iterations = 0
+    while iterations < maxIterations:
+        dx = points[n][0] - targetX
+        dy = points[n][1] - targetY
+        if dx * dx + dy * dy < toleranceSq:
+            break
+        _fabrik_pass(points, lengths, targetX, targetY, baseX, baseY)
+        iterations += 1
+    return iterations
+
+
+if njit is not None:
+    _fabrik_pass = njit(cache=True, fastmath=True)(_fabrik_pass)
+    _fabrik_solve = njit(cache=True, fastmath=True)(_fabrik_solve)
+
+
+def _runKernel(kernel, points, lengths, *args):
+    """Run a solver kernel on the (N+1, 2) points array in place.
+    
+    Without Numba the kernel works on nested lists of Python floats, which
+    index much faster than numpy scalars; points is synced once per call.
+    """
+    if njit is not None:
+        return kernel(points, lengths, *args)
+    chain = points.tolist()
+    result = kernel(chain, lengths.tolist(), *args)
+    points[:] = chain
+    return result
 
 
 class FabrikSolver2D:
     """FABRIK Inverse Kinematics solver for 2D space."""
     
-    def __init__(self, baseX=0, baseY=0, marginOfError=0.01):
+    def __init__(self, baseX=0, baseY=0, marginOfError=0.01, maxIterations=20,
+                 analyticFastPath=True):
         """
         Initialize the FABRIK solver.
         
@@ -44,11 +115,26 @@ class FabrikSolver2D:
             baseX: X coordinate of the fixed base point
             baseY: Y coordinate of the fixed base point
             marginOfError: Distance threshold for convergence
+            maxIterations: Maximum number of FABRIK iterations per solve
+            analyticFastPath: Solve three segment chains in closed form
         """
-        self.basePoint = np.array([baseX, baseY])
-        self.segments = []
+        self.basePoint = (float(baseX), float(baseY))
         self.armLength = 0
+        self._armLengthSq = 0
         self.marginOfError = marginOfError
+        self._marginSq = marginOfError ** 2
+        self.maxIterations = maxIterations
+        self.analyticFastPath = analyticFastPath
+        
+        # Chain as built by addSegment (absolute angles in degrees)
+        self._pointList = [self.basePoint]
+        self._lengthList = []
+        self.angles = []
+        
+        # Joint coordinates as an (N+1, 2) array (row 0 is the base) and
+        # segment lengths as an (N,) array, finalized lazily on first use
+        self.points = None
+        self.lengths = None
     
     def addSegment(self, length, angle):
         """
@@ -58,14 +144,70 @@ class FabrikSolver2D:
             length: Length of the segment
             angle: Initial angle in degrees
         """
-        if len(self.segments) > 0:
-            segment = Segment2D(self.segments[-1].point[0], self.segments[-1].point[1], 
-                               length, angle + self.segments[-1].angle)
-        else:
-            segment = Segment2D(self.basePoint[0], self.basePoint[1], length, angle)
+        if self.points is not None:
+            # Extend the chain from its current (possibly solved) pose
+            self._pointList = [tuple(point) for point in self.points.tolist()]
+        
+        if self.angles:
+            angle += self.angles[-1]
+        
+        rad = math.radians(angle)
+        referenceX, referenceY = self._pointList[-1]
+        
+        self._pointList.append((referenceX + math.cos(rad) * length,
+                                referenceY + math.sin(rad) * length))
+        self._lengthList.append(float(length))
+        self.angles.append(angle)
+        self.armLength += length
+        self._armLengthSq = self.armLength ** 2
         
-        self.armLength += segment.length
-        self.segments.append(segment)
+        self.points = None
+        self.lengths = None
+    
+    def _finalize(self):
+        """Build the contiguous arrays used by the solver kernels."""
+        if self.points is None:
+            self.points = np.array(self._pointList, dtype=np.float64)
+            self.lengths = np.array(self._lengthList, dtype=np.float64)
+    
+    def warmup(self):
+        """Compile the solver kernels (when Numba is available) without moving the arm."""
+        self._finalize()
+        _runKernel(_fabrik_solve, self.points.copy(), self.lengths,
+                   self.points[-1, 0], self.points[-1, 1],
+                   self._marginSq, self.basePoint[0], self.basePoint[1], 1)
+    
+    def aimAt(self, targetX, targetY):
+        """
+        Rotate the whole chain about the base so the end effector points at the target.
+        
+        Keeps the current bends, which makes a better starting pose than the
+        previous one when the target jumps far away. A collinear chain is
+        left alone: aimed at the target it would lie on the base-to-target
+        line, which FABRIK cannot bend out of.
+        
+        Args:
+            targetX: Target X coordinate
+            targetY: Target Y coordinate
+        """
+        self._finalize()
+        if self._isCollinear():
+            return
+        
+        baseX, baseY = self.basePoint
+        endX = self.points[-1, 0] - baseX
+        endY = self.points[-1, 1] - baseY
+        dx = targetX - baseX
+        dy = targetY - baseY
+        if (endX == 0.0 and endY == 0.0) or (dx == 0.0 and dy == 0.0):
+            return
+        
+        dtheta = math.atan2(dy, dx) - math.atan2(endY, endX)
+        c, s = math.cos(dtheta), math.sin(dtheta)
+        offsetX = self.points[:, 0] - baseX
+        offsetY = self.points[:, 1] - baseY
+        self.points[:, 0] = baseX + offsetX * c - offsetY * s
+        self.points[:, 1] = baseY + offsetX * s + offsetY * c
     
     def isReachable(self, targetX, targetY):
         """
@@ -78,8 +220,9 @@ class FabrikSolver2D:
         Returns:
             True if target is reachable, False otherwise
         """
-        distance = np.linalg.norm(self.basePoint - np.array([targetX, targetY]))
-        return distance < self.armLength
+        dx = self.basePoint[0] - targetX
+        dy = self.basePoint[1] - targetY
+        return dx * dx + dy * dy < self._armLengthSq
     
     def inMarginOfError(self, targetX, targetY):
         """
@@ -92,8 +235,10 @@ class FabrikSolver2D:
         Returns:
             True if within margin, False otherwise
         """
-        distance = np.linalg.norm(self.segments[-1].point - np.array([targetX, targetY]))
-        return distance < self.marginOfError
+        self._finalize()
+        dx = self.points[-1, 0] - targetX
+        dy = self.points[-1, 1] - targetY
+        return bool(dx * dx + dy * dy < self._marginSq)
     
     def iterate(self, targetX, targetY):
         """
@@ -103,28 +248,137 @@ class FabrikSolver2D:
             targetX: Target X coordinate
             targetY: Target Y coordinate
         """
-        target = np.array([targetX, targetY])
-        
-        # Backward reaching (from end effector to base)
-        for i in range(len(self.segments) - 1, 0, -1):
-            if i == len(self.segments) - 1:
-                self.segments[i-1].point = (unitVector(self.segments[i-1].point - target) * 
-                                           self.segments[i].length) + target
-            else:
-                self.segments[i-1].point = (unitVector(self.segments[i-1].point - self.segments[i].point) * 
-                                           self.segments[i].length) + self.segments[i].point
-        
-        # Forward reaching (from base to end effector)
-        for i in range(len(self.segments)):
-            if i == 0:
-                self.segments[i].point = (unitVector(self.segments[i].point - self.basePoint) * 
-                                         self.segments[i].length) + self.basePoint
-            elif i == len(self.segments) - 1:
-                self.segments[i].point = (unitVector(self.segments[i-1].point - target) * 
-                                         self.segments[i].length * -1) + self.segments[i-1].point
-            else:
-                self.segments[i].point = (unitVector(self.segments[i].point - self.segments[i-1].point) * 
-                                         self.segments[i].length) + self.segments[i-1].point
+        self._finalize()
+        _runKernel(_fabrik_pass, self.points, self.lengths, float(targetX), float(targetY),
+                   self.basePoint[0], self.basePoint[1])
+    
+    def _isCollinear(self):
+        """Return True if all segments lie on one line (straight or folded back)."""
+        segments = np.diff(self.points, axis=0)
+        cross = segments[:-1, 0] * segments[1:, 1] - segments[:-1, 1] * segments[1:, 0]
+        tolerance = 1e-9 * self.lengths[:-1] * self.lengths[1:]
+        return not np.any(np.abs(cross) > tolerance)
+    
+    def _elbowSign(self):
+        """Return -1.0 if the current elbow bends clockwise, 1.0 otherwise."""
+        points = self.points
+        elbow = ((points[1, 0] - points[0, 0]) * (points[2, 1] - points[1, 1]) -
+                 (points[1, 1] - points[0, 1]) * (points[2, 0] - points[1, 0]))
+        return -1.0 if elbow < 0 else 1.0
+    
+    def _analytic3R(self, targetX, targetY):
+        """
+        Closed-form IK for a three segment chain.
+        
+        The last segment points along the base-to-target direction and the
+        first two are solved as a planar 2R arm, keeping the current elbow side.
+        
+        Args:
+            targetX: Target X coordinate
+            targetY: Target Y coordinate
+            
+        Returns:
+            True if a solution was applied, False if FABRIK should be used
+        """
+        l1, l2, l3 = self._lengthList
+        baseX, baseY = self.basePoint
+        dx = targetX - baseX
+        dy = targetY - baseY
+        distance = math.hypot(dx, dy)
+        if distance == 0.0:
+            return False
+        
+        # Wrist center, relative to the base
+        ux = dx / distance
+        uy = dy / distance
+        wx = dx - ux * l3
+        wy = dy - uy * l3
+        
+        c2 = (wx * wx + wy * wy - l1 * l1 - l2 * l2) / (2 * l1 * l2)
+        if c2 < -1.0 or c2 > 1.0:
+            return False
+        
+        points = self.points
+        s2 = math.sqrt(1.0 - c2 * c2) * self._elbowSign()
+        
+        q2 = math.atan2(s2, c2)
+        q1 = math.atan2(wy, wx) - math.atan2(l2 * s2, l1 + l2 * c2)
+        
+        points[0] = self.basePoint
+        points[1, 0] = baseX + math.cos(q1) * l1
+        points[1, 1] = baseY + math.sin(q1) * l1
+        points[2, 0] = points[1, 0] + math.cos(q1 + q2) * l2
+        points[2, 1] = points[1, 1] + math.sin(q1 + q2) * l2
+        points[3, 0] = points[2, 0] + ux * l3
+        points[3, 1] = points[2, 1] + uy * l3
+        return True
+    
+    def _aimRows(self, points, targets, rows):
+        """
+        Vectorized aimAt over some rows of a batch.
+        
+        Args:
+            points: (M, N+1, 2) joint positions, updated in place
+            targets: (M, 2) target coordinates
+            rows: Indices of the rows to aim
+        """
+        base = np.array(self.basePoint)
+        relative = self.points - base
+        endX, endY = relative[-1]
+        if self._isCollinear() or (endX == 0.0 and endY == 0.0):
+            return
+        
+        offset = targets[rows] - base
+        rows = rows[(offset[:, 0] != 0.0) | (offset[:, 1] != 0.0)]
+        offset = targets[rows] - base
+        
+        dtheta = np.arctan2(offset[:, 1], offset[:, 0]) - math.atan2(endY, endX)
+        c = np.cos(dtheta)[:, np.newaxis]
+        s = np.sin(dtheta)[:, np.newaxis]
+        points[rows, :, 0] = base[0] + relative[:, 0] * c - relative[:, 1] * s
+        points[rows, :, 1] = base[1] + relative[:, 0] * s + relative[:, 1] * c
+    
+    def _analytic3RBatch(self, points, targets, rows):
+        """
+        Vectorized _analytic3R over some rows of a batch.
+        
+        Args:
+            points: (M, 4, 2) joint positions, updated in place
+            targets: (M, 2) target coordinates
+            rows: Indices of the rows to solve
+            
+        Returns:
+            Indices of the rows that were solved; the rest need FABRIK
+        """
+        l1, l2, l3 = self._lengthList
+        base = np.array(self.basePoint)
+        
+        offset = targets[rows] - base
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        keep = distance > 0.0
+        rows, offset, distance = rows[keep], offset[keep], distance[keep]
+        
+        # Wrist centers, relative to the base
+        direction = offset / distance[:, np.newaxis]
+        wrist = offset - direction * l3
+        
+        c2 = (np.einsum('ij,ij->i', wrist, wrist) - l1 * l1 - l2 * l2) / (2 * l1 * l2)
+        keep = np.abs(c2) <= 1.0
+        rows, direction, wrist, c2 = rows[keep], direction[keep], wrist[keep], c2[keep]
+        s2 = np.sqrt(1.0 - c2 * c2) * self._elbowSign()
+        
+        q2 = np.arctan2(s2, c2)
+        q1 = np.arctan2(wrist[:, 1], wrist[:, 0]) - np.arctan2(l2 * s2, l1 + l2 * c2)
+        
+        chain = np.empty((rows.size, 4, 2), dtype=np.float64)
+        chain[:, 0] = base
+        chain[:, 1, 0] = base[0] + np.cos(q1) * l1
+        chain[:, 1, 1] = base[1] + np.sin(q1) * l1
+        chain[:, 2, 0] = chain[:, 1, 0] + np.cos(q1 + q2) * l2
+        chain[:, 2, 1] = chain[:, 1, 1] + np.sin(q1 + q2) * l2
+        chain[:, 3] = chain[:, 2] + direction * l3
+        points[rows] = chain
+        return rows
     
     def compute(self, targetX, targetY):
         """
@@ -135,15 +389,110 @@ class FabrikSolver2D:
             targetY: Target Y coordinate
             
         Returns:
-            True if target was reached, False if unreachable
+            Tuple (reached, iterations): whether the end effector ended within
+            the margin of error, and how many iterations were used. Unreachable
+            targets return (False, 0) without moving the arm.
         """
+        # Unbox the target once; the checks and the kernel all take plain floats
+        targetX, targetY = float(targetX), float(targetY)
+        
         if not self.isReachable(targetX, targetY):
-            return False
+            return False, 0
             
-        while not self.inMarginOfError(targetX, targetY):
-            self.iterate(targetX, targetY)
+        self._finalize()
+        if (self.analyticFastPath and len(self._lengthList) == 3 and
+                self._analytic3R(targetX, targetY)):
+            return self.inMarginOfError(targetX, targetY), 0
         
-        return True
+        iterations = _runKernel(_fabrik_solve, self.points, self.lengths, targetX, targetY,
+                                self._marginSq, self.basePoint[0], self.basePoint[1],
+                                self.maxIterations)
+        
+        return self.inMarginOfError(targetX, targetY), iterations
+    
+    def compute_batch(self, targets, aim=False):
+        """
+        Solve inverse kinematics for many targets at once.
+        
+        Every target starts from the current pose and the solver state is
+        left untouched. Three segment chains take the same closed-form fast
+        path as compute(); the remaining targets run vectorized FABRIK
+        sweeps, dropping out as they converge.
+        
+        Args:
+            targets: Array-like of shape (M, 2) with target coordinates
+            aim: Rotate each target's starting pose toward it first, like
+                aimAt() followed by compute()
+            
+        Returns:
+            Tuple (points, reached, iterations): the (M, N+1, 2) joint
+            positions per target, a boolean (M,) mask of targets reached
+            within the margin of error, and the (M,) iterations used
+        """
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        self._finalize()
+        
+        lengths = self.lengths
+        n = len(lengths)
+        base = np.array(self.basePoint)
+        points = np.repeat(self.points[np.newaxis], len(targets), axis=0)
+        iterations = np.zeros(len(targets), dtype=np.int64)
+        
+        # Scratch buffers, sliced to the number of active targets each pass
+        deltaBuffer = np.empty((len(targets), 2), dtype=np.float64)
+        normBuffer = np.empty(len(targets), dtype=np.float64)
+        
+        offset = targets - base
+        reachable = np.einsum('ij,ij->i', offset, offset) < self._armLengthSq
+        active = np.flatnonzero(reachable)
+        
+        if aim:
+            self._aimRows(points, targets, active)
+        
+        if self.analyticFastPath and n == 3:
+            solved = self._analytic3RBatch(points, targets, active)
+            active = np.setdiff1d(active, solved, assume_unique=True)
+        
+        for _ in range(self.maxIterations):
+            error = points[active, n] - targets[active]
+            active = active[np.einsum('ij,ij->i', error, error) >= self._marginSq]
+            if active.size == 0:
+                break
+            
+            chain = points[active]
+            delta = deltaBuffer[:active.size]
+            norms = normBuffer[:active.size]
+            
+            # Backward reaching (from end effector to base)
+            chain[:, n] = targets[active]
+            for i in range(n, 1, -1):
+                np.subtract(chain[:, i-1], chain[:, i], out=delta)
+                _scaleRows(delta, lengths[i-1], norms)
+                np.add(chain[:, i], delta, out=chain[:, i-1])
+            
+            # Forward reaching (from base to end effector)
+            chain[:, 0] = base
+            for i in range(1, n + 1):
+                np.subtract(chain[:, i], chain[:, i-1], out=delta)
+                _scaleRows(delta, lengths[i-1], norms)
+                np.add(chain[:, i-1], delta, out=chain[:, i])
+            
+            points[active] = chain
+            iterations[active] += 1
+        
+        error = points[:, n] - targets
+        reached = reachable & (np.einsum('ij,ij->i', error, error) < self._marginSq)
+        return points, reached, iterations
+    
+    def get_joint_positions_array(self):
+        """
+        Get all joint positions including the base point, without copying.
+        
+        Returns:
+            The solver's (N+1, 2) float64 points array; treat it as read-only
+        """
+        self._finalize()
+        return self.points
     
     def get_joint_positions(self):
         """
@@ -152,7 +501,5 @@ class FabrikSolver2D:
         Returns:
             List of [x, y] coordinate pairs
         """
-        positions = [self.basePoint.tolist()]
-        for segment in self.segments:
-            positions.append(segment.point.tolist())
-        return positions
+        self._finalize()
+        return self.points.tolist()
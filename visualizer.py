@@ -3,6 +3,7 @@ Interactive Pygame Visualizer for FABRIK IK
 Real-time visualization with mouse control
 """
 import pygame
+import numpy as np
 import sys
 from solver import FabrikSolver2D
 
@@ -13,30 +14,32 @@ class FabrikVisualizer:
     Click anywhere to move the arm to that position.
     """
     
-    def __init__(self, width=1000, height=700):
+    def __init__(self, width=1000, height=700, reachability=False):
         """
         Initialize the visualizer.
         
         Args:
             width: Window width in pixels
             height: Window height in pixels
+            reachability: Shade the background with a reachability map
         """
         pygame.init()
         
         # Window setup
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
+        self.screen = pygame.display.set_mode((width, height), pygame.DOUBLEBUF)
         pygame.display.set_caption("FABRIK Interactive Visualizer - Click to Move Arm")
         
-        # Colors
-        self.BLACK = (0, 0, 0)
-        self.WHITE = (255, 255, 255)
-        self.BLUE = (50, 150, 255)
-        self.RED = (255, 80, 80)
-        self.GREEN = (80, 255, 80)
-        self.GRAY = (150, 150, 150)
-        self.YELLOW = (255, 255, 100)
+        # Colors (pre-built so draw calls don't convert tuples each time)
+        self.BLACK = pygame.Color(0, 0, 0)
+        self.WHITE = pygame.Color(255, 255, 255)
+        self.BLUE = pygame.Color(50, 150, 255)
+        self.RED = pygame.Color(255, 80, 80)
+        self.GREEN = pygame.Color(80, 255, 80)
+        self.GRAY = pygame.Color(150, 150, 150)
+        self.YELLOW = pygame.Color(255, 255, 100)
+        self.GRID = pygame.Color(40, 40, 40)
         
         # Create arm at center of screen
         center_x = width // 2
@@ -48,9 +51,14 @@ class FabrikVisualizer:
         self.solver.addSegment(120, 0)   # Forearm
         self.solver.addSegment(100, 0)   # Hand
         
+        # Warm up the solver kernels (JIT compile when Numba is available)
+        self.solver.warmup()
+        
         # Target
         self.target = None
         self.target_reachable = True
+        self.target_reached = True
+        self.solve_iterations = 0
         
         # Animation
         self.clock = pygame.time.Clock()
@@ -60,6 +68,44 @@ class FabrikVisualizer:
         self.font = pygame.font.Font(None, 28)
         self.title_font = pygame.font.Font(None, 36)
         
+        # Static text, rendered once
+        self._title_surf = self.title_font.render("FABRIK Interactive Visualizer", True, self.WHITE)
+        self._instr_surf = self.font.render("Click or drag to move the arm", True, self.GRAY)
+        self._legend_surfs = [
+            self.font.render("Base (Fixed)", True, self.WHITE),
+            self.font.render("Joints", True, self.WHITE),
+            self.font.render("End Effector", True, self.WHITE),
+        ]
+        
+        # Dynamic text, re-rendered only when its value changes
+        self._last_target = None
+        self._target_surf = None
+        self._status_surf = None
+        self._last_ee = None
+        self._ee_surf = None
+        self._last_fps_int = None
+        self._fps_surf = None
+        
+        # Static layers (grid and info panel), drawn once and blitted per frame
+        self._grid_surface = self.build_grid_surface()
+        self._panel_surface = self.build_panel_surface()
+        
+        # Redraw only when the scene has changed, and only push the regions
+        # that changed to the display
+        self._dirty = True
+        self._full_redraw = True
+        self._dirty_rects = []
+        self._scene_rects = []
+        self._fps_rect = None
+        
+        # Reachability map
+        self.reachability = reachability
+        self.reachability_step = 10
+        self.reachability_surface = None
+        self._map_stale = False
+        if self.reachability:
+            self.build_reachability_map()
+        
     def handle_events(self):
         """
         Handle user input events.
@@ -67,57 +113,220 @@ class FabrikVisualizer:
         Returns:
             Boolean indicating if program should continue running
         """
+        new_target = None
+        aim = False
+        drag_ended = False
+        
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type == pygame.WINDOWEXPOSED:
+                self._dirty = True
+                self._full_redraw = True
+            
             if event.type == pygame.MOUSEBUTTONDOWN:
-                # Set new target on mouse click
-                self.target = pygame.mouse.get_pos()
-                self.target_reachable = self.solver.compute(self.target[0], self.target[1])
+                # New target on mouse click; may be far from the current pose
+                new_target = pygame.mouse.get_pos()
+                aim = True
+            
+            if event.type == pygame.MOUSEMOTION and event.buttons[0]:
+                # Dragging: the previous solution is already a good start
+                new_target = event.pos
+            
+            if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                drag_ended = True
+        
+        # Solve once per frame for the latest target only
+        if new_target is not None:
+            self.set_target(new_target, aim)
+        
+        # The reachability map is too slow to rebuild on every drag frame;
+        # refresh it once the drag is over
+        if drag_ended and self._map_stale:
+            self.refresh_reachability_map()
         
         return True
     
-    def draw_grid(self):
-        """Draw a subtle grid in the background."""
+    def set_target(self, target, aim=False):
+        """
+        Move the arm toward a new target.
+        
+        Args:
+            target: (x, y) target position in pixels
+            aim: Rotate the current pose toward the target before solving.
+                Set for clicks; these also rebuild the reachability map,
+                while drag updates leave it for the end of the drag
+        """
+        self.target = target
+        self.target_reachable = self.solver.isReachable(target[0], target[1])
+        if aim and self.target_reachable:
+            self.solver.aimAt(target[0], target[1])
+        self.target_reached, self.solve_iterations = self.solver.compute(target[0], target[1])
+        if self.reachability:
+            if aim:
+                self.refresh_reachability_map()
+            else:
+                self._map_stale = True
+        self._dirty = True
+    
+    def refresh_reachability_map(self):
+        """Rebuild the reachability map for the current pose and repaint everything."""
+        self.build_reachability_map()
+        self._map_stale = False
+        self._full_redraw = True
+        self._dirty = True
+    
+    def build_reachability_map(self):
+        """
+        Solve a grid of targets from the current pose in one batched call.
+        
+        Each cell is aimed and solved like a click, so cells the arm converges to
+        are shaded green (brighter = fewer iterations, closed-form solves
+        count as none), reachable cells that hit the iteration cap dark red.
+        """
+        step = self.reachability_step
+        xs = np.arange(step // 2, self.width, step)
+        ys = np.arange(step // 2, self.height, step)
+        grid_x, grid_y = np.meshgrid(xs, ys, indexing='ij')
+        targets = np.column_stack((grid_x.ravel(), grid_y.ravel()))
+        
+        _, reached, iterations = self.solver.compute_batch(targets, aim=True)
+        reached = reached.reshape(grid_x.shape)
+        iterations = iterations.reshape(grid_x.shape)
+        offset_x = grid_x - self.solver.basePoint[0]
+        offset_y = grid_y - self.solver.basePoint[1]
+        reachable = offset_x * offset_x + offset_y * offset_y < self.solver.armLength ** 2
+        
+        shade = np.zeros(grid_x.shape + (3,), dtype=np.uint8)
+        speed = 1.0 - iterations / max(self.solver.maxIterations, 1)
+        shade[..., 1] = np.where(reached, 30 + 90 * speed, 0).astype(np.uint8)
+        shade[reachable & ~reached] = (70, 20, 20)
+        
+        cells = pygame.surfarray.make_surface(shade)
+        self.reachability_surface = pygame.transform.scale(
+            cells, (len(xs) * step, len(ys) * step))
+    
+    def draw_reachability(self):
+        """Draw the reachability map behind the grid."""
+        if self.reachability_surface is not None:
+            self.screen.blit(self.reachability_surface, (0, 0))
+    
+    def restore_background(self, rect):
+        """
+        Repaint the static layers (map, grid and panel) inside a rect.
+        
+        Args:
+            rect: Screen region to restore
+        """
+        self.screen.fill(self.BLACK, rect)
+        if self.reachability_surface is not None:
+            self.screen.blit(self.reachability_surface, rect, area=rect)
+        self.screen.blit(self._grid_surface, rect, area=rect)
+        self.screen.blit(self._panel_surface, rect, area=rect)
+    
+    def finish_layer(self, surface):
+        """
+        Prepare a pre-rendered layer for fast per-frame blitting.
+        
+        Args:
+            surface: Layer drawn on a black background
+            
+        Returns:
+            The layer in display pixel format, black keyed as transparent
+            with RLE acceleration
+        """
+        surface = surface.convert()
+        surface.set_colorkey(self.BLACK, pygame.RLEACCEL)
+        return surface
+    
+    def build_grid_surface(self):
+        """
+        Pre-render the background grid.
+        
+        Returns:
+            Surface with the grid lines, black keyed as transparent
+        """
+        surface = pygame.Surface((self.width, self.height))
+        surface.fill(self.BLACK)
         for x in range(0, self.width, 50):
-            pygame.draw.line(self.screen, (40, 40, 40), (x, 0), (x, self.height), 1)
+            pygame.draw.line(surface, self.GRID, (x, 0), (x, self.height), 1)
         for y in range(0, self.height, 50):
-            pygame.draw.line(self.screen, (40, 40, 40), (0, y), (self.width, y), 1)
+            pygame.draw.line(surface, self.GRID, (0, y), (self.width, y), 1)
+        return self.finish_layer(surface)
+    
+    def build_panel_surface(self):
+        """
+        Pre-render the static part of the info panel (title, instructions, legend).
+        
+        Returns:
+            Surface with the static text, black keyed as transparent
+        """
+        surface = pygame.Surface((self.width, self.height))
+        surface.fill(self.BLACK)
+        
+        # Title
+        surface.blit(self._title_surf, (20, 20))
+        
+        # Instructions
+        surface.blit(self._instr_surf, (20, 60))
+        
+        # Legend
+        legend_y = 100
+        pygame.draw.circle(surface, self.YELLOW, (self.width - 180, legend_y), 8)
+        surface.blit(self._legend_surfs[0], (self.width - 160, legend_y - 12))
+        
+        pygame.draw.circle(surface, self.RED, (self.width - 180, legend_y + 35), 6)
+        surface.blit(self._legend_surfs[1], (self.width - 160, legend_y + 23))
+        
+        pygame.draw.circle(surface, self.GREEN, (self.width - 180, legend_y + 70), 8)
+        surface.blit(self._legend_surfs[2], (self.width - 160, legend_y + 58))
+        return self.finish_layer(surface)
+    
+    def draw_grid(self):
+        """Draw a subtle grid in the background."""
+        self.screen.blit(self._grid_surface, (0, 0))
     
     def draw_arm(self):
-        """Draw the robotic arm."""
-        positions = self.solver.get_joint_positions()
+        """
+        Draw the robotic arm.
         
-        # Draw segments as lines
-        for i in range(len(positions) - 1):
-            start_pos = (int(positions[i][0]), int(positions[i][1]))
-            end_pos = (int(positions[i+1][0]), int(positions[i+1][1]))
-            pygame.draw.line(self.screen, self.BLUE, start_pos, end_pos, 8)
+        Returns:
+            Bounding rect of everything drawn
+        """
+        positions = self.solver.get_joint_positions_array()
+        rects = []
+        
+        # Integer pixel coordinates, computed once for lines and joints
+        positions_int = [tuple(point) for point in positions.astype(np.int32).tolist()]
+        
+        # Draw segments as one connected polyline
+        rects.append(pygame.draw.lines(self.screen, self.BLUE, False, positions_int, 8))
         
         # Draw joints
-        for i, pos in enumerate(positions):
+        for i, pos in enumerate(positions_int):
             if i == 0:
                 # Base point (larger, different color)
-                pygame.draw.circle(self.screen, self.YELLOW, 
-                                 (int(pos[0]), int(pos[1])), 12)
-                pygame.draw.circle(self.screen, self.BLACK, 
-                                 (int(pos[0]), int(pos[1])), 12, 2)
-            elif i == len(positions) - 1:
+                rects.append(pygame.draw.circle(self.screen, self.YELLOW, pos, 12))
+                pygame.draw.circle(self.screen, self.BLACK, pos, 12, 2)
+            elif i == len(positions_int) - 1:
                 # End effector (green)
-                pygame.draw.circle(self.screen, self.GREEN, 
-                                 (int(pos[0]), int(pos[1])), 10)
-                pygame.draw.circle(self.screen, self.BLACK, 
-                                 (int(pos[0]), int(pos[1])), 10, 2)
+                rects.append(pygame.draw.circle(self.screen, self.GREEN, pos, 10))
+                pygame.draw.circle(self.screen, self.BLACK, pos, 10, 2)
             else:
                 # Regular joints
-                pygame.draw.circle(self.screen, self.RED, 
-                                 (int(pos[0]), int(pos[1])), 8)
-                pygame.draw.circle(self.screen, self.BLACK, 
-                                 (int(pos[0]), int(pos[1])), 8, 2)
+                rects.append(pygame.draw.circle(self.screen, self.RED, pos, 8))
+                pygame.draw.circle(self.screen, self.BLACK, pos, 8, 2)
+        
+        return rects[0].unionall(rects[1:])
     
     def draw_target(self):
-        """Draw the target point."""
+        """
+        Draw the target point.
+        
+        Returns:
+            Bounding rect of the target marker, or None if there is no target
+        """
         if self.target:
             color = self.GREEN if self.target_reachable else self.RED
             # Draw crosshair
@@ -128,56 +337,68 @@ class FabrikVisualizer:
             pygame.draw.line(self.screen, color, 
                            (self.target[0], self.target[1] - size), 
                            (self.target[0], self.target[1] + size), 3)
-            # Draw circle
-            pygame.draw.circle(self.screen, color, self.target, 20, 3)
+            # Draw circle (encloses the crosshair)
+            return pygame.draw.circle(self.screen, color, self.target, 20, 3)
+        return None
     
     def draw_info(self):
-        """Draw information text on screen."""
-        # Title
-        title = self.title_font.render("FABRIK Interactive Visualizer", True, self.WHITE)
-        self.screen.blit(title, (20, 20))
+        """
+        Draw information text on screen.
         
-        # Instructions
-        instruction = self.font.render("Click anywhere to move the arm", True, self.GRAY)
-        self.screen.blit(instruction, (20, 60))
+        Returns:
+            List of rects covering the text that can change
+        """
+        rects = []
+        
+        # Title, instructions and legend
+        self.screen.blit(self._panel_surface, (0, 0))
         
         # Target info
         if self.target:
-            target_text = f"Target: ({self.target[0]}, {self.target[1]})"
-            status_text = "Status: ✓ Reachable" if self.target_reachable else "Status: ✗ Out of Reach"
+            target_state = (self.target, self.target_reachable,
+                            self.target_reached, self.solve_iterations)
+            if target_state != self._last_target:
+                target_text = f"Target: ({self.target[0]}, {self.target[1]})"
+                if not self.target_reachable:
+                    status_text = "Status: ✗ Out of Reach"
+                    status_color = self.RED
+                elif not self.target_reached:
+                    status_text = f"Status: ! Not converged after {self.solve_iterations} iterations"
+                    status_color = self.YELLOW
+                else:
+                    status_text = "Status: ✓ Reachable"
+                    status_color = self.GREEN
+                
+                self._target_surf = self.font.render(target_text, True, self.WHITE)
+                self._status_surf = self.font.render(status_text, True, status_color)
+                self._last_target = target_state
             
-            target_surface = self.font.render(target_text, True, self.WHITE)
-            status_color = self.GREEN if self.target_reachable else self.RED
-            status_surface = self.font.render(status_text, True, status_color)
-            
-            self.screen.blit(target_surface, (20, self.height - 80))
-            self.screen.blit(status_surface, (20, self.height - 50))
+            rects.append(self.screen.blit(self._target_surf, (20, self.height - 80)))
+            rects.append(self.screen.blit(self._status_surf, (20, self.height - 50)))
         
         # Arm info
-        positions = self.solver.get_joint_positions()
-        end_effector = positions[-1]
-        ee_text = f"End Effector: ({int(end_effector[0])}, {int(end_effector[1])})"
-        ee_surface = self.font.render(ee_text, True, self.WHITE)
-        self.screen.blit(ee_surface, (self.width - 300, self.height - 50))
-        
-        # FPS
-        fps_text = f"FPS: {int(self.clock.get_fps())}"
-        fps_surface = self.font.render(fps_text, True, self.GRAY)
-        self.screen.blit(fps_surface, (self.width - 100, 20))
+        end_x, end_y = self.solver.get_joint_positions_array()[-1]
+        end_effector = (int(end_x), int(end_y))
+        if end_effector != self._last_ee:
+            ee_text = f"End Effector: ({end_effector[0]}, {end_effector[1]})"
+            self._ee_surf = self.font.render(ee_text, True, self.WHITE)
+            self._last_ee = end_effector
+        rects.append(self.screen.blit(self._ee_surf, (self.width - 300, self.height - 50)))
         
-        # Legend
-        legend_y = 100
-        pygame.draw.circle(self.screen, self.YELLOW, (self.width - 180, legend_y), 8)
-        legend_text = self.font.render("Base (Fixed)", True, self.WHITE)
-        self.screen.blit(legend_text, (self.width - 160, legend_y - 12))
-        
-        pygame.draw.circle(self.screen, self.RED, (self.width - 180, legend_y + 35), 6)
-        legend_text = self.font.render("Joints", True, self.WHITE)
-        self.screen.blit(legend_text, (self.width - 160, legend_y + 23))
+        return rects
+    
+    def draw_fps(self):
+        """
+        Draw the FPS counter.
         
-        pygame.draw.circle(self.screen, self.GREEN, (self.width - 180, legend_y + 70), 8)
-        legend_text = self.font.render("End Effector", True, self.WHITE)
-        self.screen.blit(legend_text, (self.width - 160, legend_y + 58))
+        Returns:
+            Rect covering the counter
+        """
+        int_fps = int(self.clock.get_fps())
+        if int_fps != self._last_fps_int:
+            self._fps_surf = self.font.render(f"FPS: {int_fps}", True, self.GRAY)
+            self._last_fps_int = int_fps
+        return self.screen.blit(self._fps_surf, (self.width - 100, 20))
     
     def run(self):
         """Main application loop."""
@@ -187,17 +408,52 @@ class FabrikVisualizer:
             # Handle events
             running = self.handle_events()
             
+            # The FPS readout is the only thing that changes on its own
+            fps_changed = int(self.clock.get_fps()) != self._last_fps_int
+            
+            # Nothing changed: skip drawing and just keep the frame pacing
+            if not (self._dirty or fps_changed):
+                self.clock.tick(self.fps)
+                continue
+            
+            # Only the FPS number changed: repaint just its region, unless the
+            # arm or text overlaps it
+            if (not self._dirty and self._fps_rect is not None and
+                    self._fps_rect.collidelist(self._scene_rects) == -1):
+                self.restore_background(self._fps_rect)
+                fps_rect = self.draw_fps()
+                pygame.display.update([self._fps_rect, fps_rect])
+                self._fps_rect = fps_rect
+                self.clock.tick(self.fps)
+                continue
+            
             # Clear screen
             self.screen.fill(self.BLACK)
             
             # Draw everything
+            self.draw_reachability()
             self.draw_grid()
-            self.draw_target()
-            self.draw_arm()
-            self.draw_info()
+            scene_rects = [self.draw_target(), self.draw_arm()] + self.draw_info()
+            scene_rects = [rect for rect in scene_rects if rect is not None]
+            fps_rect = self.draw_fps()
+            
+            # Update display: push only what moved (old and new positions)
+            if self._full_redraw:
+                pygame.display.flip()
+                self._full_redraw = False
+            else:
+                if self._dirty:
+                    self._dirty_rects.extend(self._scene_rects)
+                    self._dirty_rects.extend(scene_rects)
+                if self._fps_rect is not None:
+                    self._dirty_rects.append(self._fps_rect)
+                self._dirty_rects.append(fps_rect)
+                pygame.display.update(self._dirty_rects)
+                self._dirty_rects.clear()
             
-            # Update display
-            pygame.display.flip()
+            self._scene_rects = scene_rects
+            self._fps_rect = fps_rect
+            self._dirty = False
             self.clock.tick(self.fps)
         
         pygame.quit()